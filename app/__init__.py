@@ -7,10 +7,13 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from celery import Celery
 from celery import signals
+from celery.utils.log import get_logger
 
 from config import Config
 
 
+logger = get_logger(__name__)
+
 app = Flask(__name__, instance_relative_config=True)
 app.config.from_object(Config)
 
@@ -18,6 +21,19 @@ db = SQLAlchemy(app)
 celery = Celery('proj')
 celery.config_from_object(app.config)
 celery_state = celery.events.State()
+celery_event_handlers = []
+
+
+def on_celery_event(event):
+    """Update celery state, then notify every registered event handler."""
+    celery_state.event(event)
+    for handler in celery_event_handlers:
+        # A failing handler must not stop the monitor, or `celery_state`
+        # goes stale and storing results fails.
+        try:
+            handler(event)
+        except Exception:
+            logger.exception('Celery event handler %r failed', handler)
 
 
 def run_celery_state_monitor():
@@ -27,7 +43,7 @@ def run_celery_state_monitor():
     def monitor():
         with celery.connection() as cnn:
             recv = celery.events.Receiver(cnn,
-                                          handlers={'*': celery_state.event})
+                                          handlers={'*': on_celery_event})
             recv.capture(limit=None, timeout=None, wakeup=True)
 
     t = Thread(target=monitor, daemon=True)
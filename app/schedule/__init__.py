@@ -2,4 +2,6 @@
 
 from . import models
 from . import schedulers
+from . import stats
 from . import tasks
+from . import views
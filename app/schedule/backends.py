@@ -9,6 +9,7 @@ from celery.backends.database import retry
 from app import db
 from app import celery_state
 from .models import TaskResult
+from .stats import record_result
 
 
 class DatabaseBackend(BaseBackend):
@@ -34,4 +35,5 @@ class DatabaseBackend(BaseBackend):
         instance.meta = json.dumps(vars(request))
 
         db.session.add(instance)
+        record_result(instance)
         db.session.commit()
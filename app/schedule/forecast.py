@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from celery import current_app as celery_app
+from celery import schedules
+from celery.utils.timeutils import maybe_make_aware
+
+from app import db
+from .models import CrontabSchedule
+from .models import IntervalSchedule
+from .models import ScheduleMeta
+from .models import ScheduleTask
+
+
+DEFAULT_DAYS = 7
+DEFAULT_WINDOW = 15
+DEFAULT_TOP = 5
+
+CRONTAB_FIELDS = ('minute', 'hour', 'day_of_week', 'day_of_month',
+                  'month_of_year')
+
+
+def app_time(value):
+    """Convert a datetime to naive time in the celery app timezone.
+
+    Beat evaluates crontabs in this timezone. Like beat, naive values are
+    read as UTC when ``CELERY_ENABLE_UTC`` is set.
+    """
+    if value.tzinfo is None:
+        if not celery_app.conf.CELERY_ENABLE_UTC:
+            return value
+        value = maybe_make_aware(value)
+    return value.astimezone(celery_app.timezone).replace(tzinfo=None)
+
+
+def minute_fields(start, minutes):
+    """Return the crontab field values of every minute in the horizon.
+
+    Fields are returned as integer arrays in celery's numbering, which
+    means Sunday is day ``0`` of the week.
+    """
+    t = np.datetime64(start, 'm') + np.arange(minutes)
+    hours = t.astype('datetime64[h]')
+    days = t.astype('datetime64[D]')
+    months = t.astype('datetime64[M]')
+    return {
+        'minute': (t - hours).astype(int),
+        'hour': (hours - days).astype(int),
+        # 1970-01-01 was a Thursday
+        'day_of_week': (days.astype(int) + 4) % 7,
+        'day_of_month': (days - months).astype(int) + 1,
+        'month_of_year': months.astype(int) % 12 + 1,
+    }
+
+
+def crontab_mask(spec, fields):
+    """Return a boolean array of the minutes matched by a crontab spec."""
+    schedule = schedules.crontab(**dict(zip(CRONTAB_FIELDS, spec)))
+    mask = None
+    for name, size in zip(CRONTAB_FIELDS, (60, 24, 7, 32, 13)):
+        lookup = np.zeros(size, dtype=bool)
+        lookup[list(getattr(schedule, name))] = True
+        matched = lookup[fields[name]]
+        mask = matched if mask is None else mask & matched
+    return mask
+
+
+def interval_minutes(phase, every, horizon):
+    """Return dispatch counts per minute of an interval schedule.
+
+    ``phase`` is the offset in seconds of the first dispatch from the
+    start of the horizon, ``every`` the run interval in seconds and
+    ``horizon`` the number of minutes.
+    """
+    if every >= 60:
+        runs = phase + every * np.arange(int((horizon * 60 - phase) // every)
+                                         + 1)
+        runs = runs[runs < horizon * 60]
+        return np.bincount((runs // 60).astype(int), minlength=horizon)
+
+    # Several runs per minute: count the runs up to each minute boundary.
+    bounds = np.arange(horizon + 1) * 60.0 - phase
+    runs_before = np.maximum(np.ceil(bounds / every), 0)
+    return np.diff(runs_before).astype(int)
+
+
+def load_schedules(start):
+    """Group every available enabled schedule by schedule spec and queue.
+
+    ``start`` is a naive datetime in the celery app timezone.
+    """
+    default_queue = celery_app.conf.CELERY_DEFAULT_QUEUE
+    crontabs = defaultdict(Counter)
+    intervals = Counter()
+
+    query = (
+        db.session.query(ScheduleTask.task, ScheduleTask.queue,
+                         CrontabSchedule.minute, CrontabSchedule.hour,
+                         CrontabSchedule.day_of_week,
+                         CrontabSchedule.day_of_month,
+                         CrontabSchedule.month_of_year,
+                         IntervalSchedule.every, IntervalSchedule.period,
+                         ScheduleMeta.last_run_at)
+        .outerjoin(CrontabSchedule,
+                   ScheduleTask.crontab_id == CrontabSchedule.id)
+        .outerjoin(IntervalSchedule,
+                   ScheduleTask.interval_id == IntervalSchedule.id)
+        .outerjoin(ScheduleMeta, ScheduleTask.id == ScheduleMeta.parent_id)
+        .filter(ScheduleTask.is_enabled.is_(True))
+    )
+    for row in query:
+        if row.task not in celery_app.tasks:
+            continue
+        queue = row.queue or default_queue
+        if row.minute is not None:
+            spec = tuple(getattr(row, x) or '*' for x in CRONTAB_FIELDS)
+            crontabs[spec][queue] += 1
+        elif row.period:
+            every = timedelta(**{row.period: row.every}).total_seconds()
+            if every <= 0:
+                continue
+            # Mirror beat: a never run entry is due one interval from now,
+            # an overdue entry is sent straight away.
+            last_run_at = start
+            if row.last_run_at is not None:
+                last_run_at = app_time(row.last_run_at)
+            first = last_run_at + timedelta(seconds=every)
+            phase = max((first - start).total_seconds(), 0.0)
+            intervals[(queue, every, round(phase))] += 1
+
+    return crontabs, intervals
+
+
+def find_peaks(counts, window, top):
+    """Return the ``top`` busiest non-overlapping windows of ``counts``."""
+    if not len(counts):
+        return []
+    window = max(min(window, len(counts)), 1)
+    cumsum = np.concatenate(([0], np.cumsum(counts)))
+    sums = cumsum[window:] - cumsum[:-window]
+
+    peaks = []
+    for _ in range(top):
+        i = int(np.argmax(sums))
+        if sums[i] <= 0:
+            break
+        peaks.append((i, int(sums[i])))
+        sums[max(i - window + 1, 0):i + window] = -1
+    return peaks
+
+
+def forecast(days=DEFAULT_DAYS, start=None, window=DEFAULT_WINDOW,
+             top=DEFAULT_TOP, per_minute=False):
+    """Forecast per-minute, per-queue dispatch counts of enabled schedules.
+
+    :param days: Forecast horizon in days.
+    :param start: Naive start of the horizon in the celery app timezone,
+        defaults to the current minute.
+    :param window: Peak window length in minutes.
+    :param top: Number of peak windows reported per queue.
+    :param per_minute: Include the full per-minute counts of every queue.
+    """
+    start = start or app_time(celery_app.now())
+    start = start.replace(second=0, microsecond=0)
+    horizon = int(days * 24 * 60)
+    fields = minute_fields(start, horizon)
+    crontabs, intervals = load_schedules(start)
+
+    counts = defaultdict(lambda: np.zeros(horizon, dtype=np.int64))
+    # One mask is alive at a time, whatever the number of distinct specs.
+    for spec, queues in crontabs.items():
+        mask = crontab_mask(spec, fields)
+        for queue, n in queues.items():
+            counts[queue] += mask * n
+    for (queue, every, phase), n in intervals.items():
+        counts[queue] += interval_minutes(phase, every, horizon) * n
+
+    queues = {}
+    for queue, data in sorted(counts.items()):
+        item = {
+            'total': int(data.sum()),
+            'max_per_minute': int(data.max()) if horizon else 0,
+            'peaks': [
+                {
+                    'start': (start + timedelta(minutes=i)).isoformat(),
+                    'end': (start + timedelta(minutes=i + window)).isoformat(),
+                    'count': n,
+                }
+                for i, n in find_peaks(data, window, top)
+            ],
+        }
+        if per_minute:
+            item['per_minute'] = data.tolist()
+        queues[queue] = item
+
+    return {
+        'start': start.isoformat(),
+        'minutes': horizon,
+        'window': window,
+        'queues': queues,
+    }
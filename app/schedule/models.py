@@ -180,9 +180,17 @@ class ScheduleInfo(db.Model):
 class TaskResult(db.Model):
 
     __tablename__ = 'task_result'
+    __table_args__ = (
+        db.Index('ix_task_result_task_and_id', 'task', 'id'),
+        db.Index('ix_task_result_status_and_id', 'status', 'id'),
+        db.Index('ix_task_result_worker_and_id', 'worker', 'id'),
+        db.Index('ix_task_result_task_and_status', 'task', 'status', 'id'),
+        db.Index('ix_task_result_done_at_and_id', 'done_at', 'id'),
+        db.Index('ix_task_result_task_and_done_at', 'task', 'done_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.String(50))
+    task_id = db.Column(db.String(50), index=True)
     task = db.Column(db.String(100))
     received_at = db.Column(db.DateTime)
     done_at = db.Column(db.DateTime)
@@ -193,12 +201,46 @@ class TaskResult(db.Model):
     meta = db.Column(db.Text)
 
 
+class TaskStats(db.Model):
+
+    __tablename__ = 'task_stats'
+    __table_args__ = (
+        db.UniqueConstraint('task', 'worker', 'minute'),
+        db.Index('ix_task_stats_minute', 'minute'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    task = db.Column(db.String(100))
+    worker = db.Column(db.String(100))
+    minute = db.Column(db.DateTime)
+    count = db.Column(db.Integer, default=0)
+    failures = db.Column(db.Integer, default=0)
+    runtime_total = db.Column(db.Float, default=0.0)
+    runtime_max = db.Column(db.Float, default=0.0)
+    runtime_histogram = db.Column(db.Text, default='[]')
+
+    @property
+    def histogram(self):
+        return json.loads(self.runtime_histogram or '[]')
+
+    @histogram.setter
+    def histogram(self, data):
+        self.runtime_histogram = json.dumps(data)
+
+    def __repr__(self):
+        return '<TaskStats {0} {1} {2}>'.format(self.task, self.worker,
+                                                self.minute)
+
+
 @event.listens_for(CrontabSchedule, 'after_insert')
 @event.listens_for(CrontabSchedule, 'after_update')
+@event.listens_for(CrontabSchedule, 'after_delete')
 @event.listens_for(IntervalSchedule, 'after_insert')
 @event.listens_for(IntervalSchedule, 'after_update')
+@event.listens_for(IntervalSchedule, 'after_delete')
 @event.listens_for(ScheduleTask, 'after_insert')
 @event.listens_for(ScheduleTask, 'after_update')
+@event.listens_for(ScheduleTask, 'after_delete')
 def update_schedule_info(mapper, connection, target):
     table = ScheduleInfo.__table__
     connection.execute(
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left
+from datetime import datetime
+from datetime import timedelta
+
+from celery import states
+from celery.utils.log import get_logger
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from .models import TaskStats
+
+logger = get_logger(__name__)
+
+
+# Upper bounds (seconds) of the runtime histogram buckets, doubling from
+# 1ms to ~70min. The last bucket catches everything above the final bound.
+# Every rollup row shares these bounds, so histograms merge by addition.
+HISTOGRAM_BOUNDS = tuple(0.001 * 2 ** i for i in range(23))
+HISTOGRAM_SIZE = len(HISTOGRAM_BOUNDS) + 1
+
+
+def truncate_minute(value):
+    """Return the rollup bucket of the given datetime."""
+    return value.replace(second=0, microsecond=0)
+
+
+def histogram_index(runtime):
+    """Return the histogram bucket index of the given runtime in seconds."""
+    return bisect_left(HISTOGRAM_BOUNDS, max(runtime, 0.0))
+
+
+def merge_histograms(a, b):
+    """Merge two histograms into a new one."""
+    a = a or [0] * HISTOGRAM_SIZE
+    b = b or [0] * HISTOGRAM_SIZE
+    return [x + y for x, y in zip(a, b)]
+
+
+def histogram_percentile(histogram, q, maximum=None):
+    """Estimate the ``q`` (0-100) percentile runtime from a histogram.
+
+    The value is interpolated linearly inside the bucket holding the
+    percentile. ``maximum`` is the largest observed runtime, it closes the
+    overflow bucket and caps the estimate.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+
+    rank = total * q / 100.0
+    seen = 0
+    value = HISTOGRAM_BOUNDS[-1]
+    for i, n in enumerate(histogram):
+        if n and seen + n >= rank:
+            lower = HISTOGRAM_BOUNDS[i - 1] if i else 0.0
+            if i < len(HISTOGRAM_BOUNDS):
+                upper = HISTOGRAM_BOUNDS[i]
+            else:
+                upper = max(maximum or lower, lower)
+            value = lower + (upper - lower) * max(rank - seen, 0) / n
+            break
+        seen += n
+
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def _update_rollup(result, minute, runtime):
+    # The row lock serializes concurrent workers of one host, which all
+    # report the same hostname and therefore update the same row.
+    instance = TaskStats.query.filter_by(
+        task=result.task, worker=result.worker, minute=minute
+    ).with_for_update().first()
+    if not instance:
+        instance = TaskStats(task=result.task, worker=result.worker,
+                             minute=minute, count=0, failures=0,
+                             runtime_total=0.0, runtime_max=0.0)
+
+    histogram = instance.histogram or [0] * HISTOGRAM_SIZE
+    histogram[histogram_index(runtime)] += 1
+
+    instance.count += 1
+    if result.status == states.FAILURE:
+        instance.failures += 1
+    instance.runtime_total += runtime
+    instance.runtime_max = max(instance.runtime_max, runtime)
+    instance.histogram = histogram
+
+    db.session.add(instance)
+    db.session.flush()
+    return instance
+
+
+def record_result(result):
+    """Add a stored :class:`TaskResult` to its per-minute rollup row.
+
+    The rollup is written inside a savepoint of the current session, so a
+    failed rollup is logged and discarded without losing the result. The
+    caller is responsible for committing both.
+    """
+    if result.status not in states.READY_STATES:
+        return None
+    if not result.received_at or not result.done_at:
+        return None
+
+    minute = truncate_minute(result.done_at)
+    runtime = max((result.done_at - result.received_at).total_seconds(), 0.0)
+
+    db.session.flush()
+    for attempt in range(2):
+        try:
+            with db.session.begin_nested():
+                return _update_rollup(result, minute, runtime)
+        except IntegrityError:
+            # Another worker inserted the row first, update it instead.
+            if attempt:
+                logger.exception('Failed to update task stats rollup')
+        except SQLAlchemyError:
+            logger.exception('Failed to update task stats rollup')
+            break
+    return None
+
+
+def query_stats(task=None, worker=None, since=None, until=None,
+                group_by=('task',), percentiles=(50, 95, 99)):
+    """Aggregate rollup rows into runtime statistics.
+
+    :param task: Only include the given task name.
+    :param worker: Only include the given worker hostname.
+    :param since: Include minutes from this datetime (inclusive).
+    :param until: Include minutes up to this datetime (exclusive).
+    :param group_by: Any of ``task``, ``worker`` and ``minute``.
+    :param percentiles: Percentiles to estimate from the merged histogram.
+    """
+    query = TaskStats.query
+    if task is not None:
+        query = query.filter(TaskStats.task == task)
+    if worker is not None:
+        query = query.filter(TaskStats.worker == worker)
+    if since is not None:
+        query = query.filter(TaskStats.minute >= truncate_minute(since))
+    if until is not None:
+        query = query.filter(TaskStats.minute < until)
+
+    groups = {}
+    for row in query.order_by(TaskStats.minute):
+        key = tuple(getattr(row, x) for x in group_by)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'count': 0,
+                'failures': 0,
+                'runtime_total': 0.0,
+                'runtime_max': 0.0,
+                'histogram': None,
+            }
+        group['count'] += row.count
+        group['failures'] += row.failures
+        group['runtime_total'] += row.runtime_total
+        group['runtime_max'] = max(group['runtime_max'], row.runtime_max)
+        group['histogram'] = merge_histograms(group['histogram'],
+                                              row.histogram)
+
+    data = []
+    for key, group in groups.items():
+        item = dict(zip(group_by, key))
+        item.update(
+            count=group['count'],
+            failures=group['failures'],
+            runtime_mean=(group['runtime_total'] / group['count']
+                          if group['count'] else None),
+            runtime_max=group['runtime_max'],
+        )
+        for q in percentiles:
+            item['runtime_p{0}'.format(q)] = histogram_percentile(
+                group['histogram'], q, group['runtime_max']
+            )
+        data.append(item)
+    return data
+
+
+def last_window(minutes=60, **kwargs):
+    """Shortcut of :func:`query_stats` over the last ``minutes`` minutes."""
+    since = datetime.now() - timedelta(minutes=minutes)
+    return query_stats(since=since, **kwargs)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from threading import Condition
+from threading import Lock
+import json
+import time
+
+from app import celery_event_handlers
+from app import celery_state
+
+
+DEFAULT_BUFFER_SIZE = 1000
+DEFAULT_BATCH_INTERVAL = 0.5
+DEFAULT_KEEPALIVE = 15
+DEFAULT_MAX_SUBSCRIBERS = 50
+
+TASK_FIELDS = ('name', 'state', 'sent', 'received', 'started', 'succeeded',
+               'failed', 'retried', 'revoked', 'runtime', 'retries',
+               'exception', 'eta', 'expires')
+WORKER_FIELDS = ('alive', 'active', 'processed', 'loadavg', 'freq')
+
+
+def task_delta(task):
+    data = dict((x, getattr(task, x, None)) for x in TASK_FIELDS)
+    data['uuid'] = task.uuid
+    data['worker'] = task.worker.hostname if task.worker else None
+    return ('task', task.uuid), data
+
+
+def worker_delta(worker):
+    data = dict((x, getattr(worker, x, None)) for x in WORKER_FIELDS)
+    data['hostname'] = worker.hostname
+    return ('worker', worker.hostname), data
+
+
+def event_delta(event):
+    """Return the ``(key, data)`` delta of an event from ``celery_state``."""
+    group = event.get('type', '').partition('-')[0]
+    if group == 'task':
+        task = celery_state.tasks.get(event.get('uuid'))
+        if task is not None:
+            return task_delta(task)
+    elif group == 'worker':
+        worker = celery_state.workers.get(event.get('hostname'))
+        if worker is not None:
+            return worker_delta(worker)
+    return None
+
+
+class Subscriber:
+    """Bounded buffer of pending deltas for one stream client.
+
+    Deltas are coalesced by key, so a client only ever receives the latest
+    state of a task or worker since its previous batch. When the buffer is
+    full the oldest delta is dropped and counted.
+    """
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.pending = OrderedDict()
+        self.dropped = 0
+        self.cond = Condition()
+
+    def push(self, key, data):
+        with self.cond:
+            self.pending.pop(key, None)
+            self.pending[key] = data
+            while len(self.pending) > self.buffer_size:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+            self.cond.notify()
+
+    def wait(self, timeout):
+        with self.cond:
+            if not self.pending:
+                self.cond.wait(timeout)
+            return bool(self.pending)
+
+    def drain(self):
+        with self.cond:
+            items, self.pending = list(self.pending.items()), OrderedDict()
+            dropped, self.dropped = self.dropped, 0
+        return items, dropped
+
+
+class EventStream:
+    """Fan out coalesced ``celery_state`` deltas to many clients.
+
+    Every client holds a server thread for as long as it is connected, so
+    at most ``max_subscribers`` clients are accepted at a time.
+    """
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE,
+                 batch_interval=DEFAULT_BATCH_INTERVAL,
+                 keepalive=DEFAULT_KEEPALIVE,
+                 max_subscribers=DEFAULT_MAX_SUBSCRIBERS):
+        self.buffer_size = buffer_size
+        self.batch_interval = batch_interval
+        self.keepalive = keepalive
+        self.max_subscribers = max_subscribers
+        self.subscribers = set()
+        self.lock = Lock()
+
+    def publish(self, event):
+        if not self.subscribers:
+            return
+        delta = event_delta(event)
+        if delta is None:
+            return
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.push(*delta)
+
+    def subscribe(self):
+        """Register a client, or return ``None`` when the stream is full.
+
+        The client starts with a snapshot of every worker and the most
+        recent tasks that fit in its buffer.
+        """
+        subscriber = Subscriber(self.buffer_size)
+        # The monitor thread mutates the state under its mutex. Holding it
+        # gives a consistent snapshot, and registering before releasing it
+        # means no event applied after the snapshot is missed.
+        with celery_state._mutex, self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                return None
+
+            workers = list(celery_state.workers.values())
+            limit = self.buffer_size - len(workers)
+            tasks = []
+            if limit > 0:
+                tasks = list(celery_state.tasks_by_time(limit=limit))
+            # Oldest first, so that later overflow evicts the oldest tasks.
+            for _, task in reversed(tasks):
+                subscriber.push(*task_delta(task))
+            for worker in workers:
+                subscriber.push(*worker_delta(worker))
+            # Trimming the snapshot is not a loss of live deltas.
+            subscriber.dropped = 0
+
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def iter_sse(self, subscriber):
+        """Yield server-sent event messages until the client goes away."""
+        try:
+            while True:
+                if not subscriber.wait(self.keepalive):
+                    yield ': keepalive\n\n'
+                    continue
+                # Let more deltas coalesce before sending a batch.
+                time.sleep(self.batch_interval)
+                items, dropped = subscriber.drain()
+                data = {
+                    'tasks': [v for k, v in items if k[0] == 'task'],
+                    'workers': [v for k, v in items if k[0] == 'worker'],
+                    'dropped': dropped,
+                }
+                yield 'event: batch\ndata: {0}\n\n'.format(
+                    json.dumps(data, default=str)
+                )
+        finally:
+            self.unsubscribe(subscriber)
+
+
+event_stream = EventStream()
+celery_event_handlers.append(event_stream.publish)
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+import json
+
+from flask import Response
+from flask import abort
+from flask import jsonify
+from flask import request
+from flask import stream_with_context
+from sqlalchemy import literal
+from sqlalchemy import tuple_
+
+from app import app
+from app import db
+from .forecast import forecast
+from .models import ScheduleInfo
+from .models import ScheduleTask
+from .models import TaskResult
+from .stats import last_window
+from .stats import query_stats
+from .stream import event_stream
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_FORECAST_DAYS = 31
+EXPORT_CHUNK_SIZE = 1000
+
+DATETIME_FORMATS = ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S',
+                    '%Y-%m-%dT%H:%M', '%Y-%m-%d')
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _parse_datetime(name, value):
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    abort(400, 'Invalid datetime for {0!r}: {1!r}'.format(name, value))
+
+
+def _get_datetime_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    return _parse_datetime(name, value)
+
+
+def _get_int_arg(name, default=None, maximum=None, minimum=0):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        abort(400, 'Invalid integer for {0!r}: {1!r}'.format(name, value))
+    if value < minimum:
+        abort(400, '{0!r} must be at least {1}'.format(name, minimum))
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def _get_cursor_arg(columns):
+    """Parse the ``after`` cursor, one comma separated value per column."""
+    value = request.args.get('after')
+    if not value:
+        return None
+    parts = value.split(',')
+    if len(parts) != len(columns):
+        abort(400, 'Invalid cursor for {0!r}: {1!r}'.format('after', value))
+
+    cursor = []
+    for column, part in zip(columns, parts):
+        if isinstance(column.type, db.DateTime):
+            cursor.append(_parse_datetime('after', part))
+        else:
+            try:
+                cursor.append(int(part))
+            except ValueError:
+                abort(400, 'Invalid cursor for {0!r}: {1!r}'.format('after',
+                                                                    value))
+    return cursor
+
+
+def _format_cursor(row, columns):
+    values = (getattr(row, x.key) for x in columns)
+    return ','.join(
+        x.isoformat() if isinstance(x, datetime) else str(x) for x in values
+    )
+
+
+def _keyset(query, columns, cursor):
+    """Order ``query`` by descending ``columns``, starting after ``cursor``.
+
+    Every keyset must be the trailing columns of an index, so each page is
+    an index range scan without sorting.
+    """
+    if cursor is not None:
+        if len(columns) == 1:
+            query = query.filter(columns[0] < cursor[0])
+        else:
+            query = query.filter(tuple_(*columns) < tuple_(*[
+                literal(v, x.type) for x, v in zip(columns, cursor)
+            ]))
+    return query.order_by(*[x.desc() for x in columns])
+
+
+def _paginate(query, columns, limit):
+    """Keyset paginate ``query`` by descending ``columns``.
+
+    Fetch one extra row to tell whether there is a next page, so that no
+    ``COUNT`` or ``OFFSET`` scan is ever needed.
+    """
+    query = _keyset(query, columns, _get_cursor_arg(columns))
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _format_cursor(rows[-1], columns)
+    return rows, next_cursor
+
+
+def result_to_dict(instance):
+    return {
+        'id': instance.id,
+        'task_id': instance.task_id,
+        'task': instance.task,
+        'received_at': _isoformat(instance.received_at),
+        'done_at': _isoformat(instance.done_at),
+        'status': instance.status,
+        'result': instance.result,
+        'traceback': instance.traceback,
+        'worker': instance.worker,
+    }
+
+
+def schedule_to_dict(instance):
+    data = {
+        'id': instance.id,
+        'name': instance.name,
+        'task': instance.task,
+        'args': instance.args,
+        'kwargs': instance.kwargs,
+        'is_enabled': instance.is_enabled,
+        'queue': instance.queue,
+        'exchange': instance.exchange,
+        'routing_key': instance.routing_key,
+        'expires_at': _isoformat(instance.expires_at),
+        'crontab': None,
+        'interval': None,
+        'modified_at': _isoformat(instance.modified_at),
+    }
+    if instance.crontab:
+        data['crontab'] = {
+            'minute': instance.crontab.minute,
+            'hour': instance.crontab.hour,
+            'day_of_week': instance.crontab.day_of_week,
+            'day_of_month': instance.crontab.day_of_month,
+            'month_of_year': instance.crontab.month_of_year,
+        }
+    if instance.interval:
+        data['interval'] = {
+            'every': instance.interval.every,
+            'period': instance.interval.period,
+        }
+    return data
+
+
+def filter_results(query):
+    for name in ('task', 'status', 'worker'):
+        value = request.args.get(name)
+        if value:
+            query = query.filter(getattr(TaskResult, name) == value)
+
+    since = _get_datetime_arg('since')
+    if since is not None:
+        query = query.filter(TaskResult.done_at >= since)
+    until = _get_datetime_arg('until')
+    if until is not None:
+        query = query.filter(TaskResult.done_at < until)
+    return query
+
+
+def result_keyset():
+    # A time range is only index-backed when it leads the keyset.
+    if request.args.get('since') or request.args.get('until'):
+        return TaskResult.done_at, TaskResult.id
+    return (TaskResult.id,)
+
+
+@app.route('/api/results')
+def list_results():
+    limit = _get_int_arg('limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, 1)
+    rows, next_cursor = _paginate(filter_results(TaskResult.query),
+                                  result_keyset(), limit)
+    return jsonify(items=[result_to_dict(x) for x in rows], next=next_cursor)
+
+
+@app.route('/api/results/export')
+def export_results():
+    query = filter_results(TaskResult.query)
+    columns = result_keyset()
+
+    def generate():
+        yield '['
+        cursor = None
+        first = True
+        while True:
+            rows = (_keyset(query, columns, cursor)
+                    .limit(EXPORT_CHUNK_SIZE).all())
+            for row in rows:
+                yield ('' if first else ',') + json.dumps(result_to_dict(row))
+                first = False
+            if len(rows) < EXPORT_CHUNK_SIZE:
+                break
+            cursor = [getattr(rows[-1], x.key) for x in columns]
+        yield ']'
+
+    return Response(stream_with_context(generate()),
+                    mimetype='application/json')
+
+
+@app.route('/api/results/<task_id>')
+def get_result(task_id):
+    instance = TaskResult.query.filter_by(task_id=task_id).first_or_404()
+    return jsonify(result_to_dict(instance))
+
+
+@app.route('/api/schedules')
+def list_schedules():
+    # Inserting, updating or deleting schedule rows touches `ScheduleInfo`,
+    # so the last change time and the request arguments identify a response.
+    etag = '{0}:{1}'.format(
+        ScheduleInfo.get_last_change_at().isoformat(),
+        request.query_string.decode('utf-8')
+    )
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    limit = _get_int_arg('limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, 1)
+    query = ScheduleTask.query
+    enabled = request.args.get('enabled')
+    if enabled:
+        query = query.filter(ScheduleTask.is_enabled ==
+                             (enabled.lower() in ('1', 'true', 'yes')))
+    queue = request.args.get('queue')
+    if queue:
+        query = query.filter(ScheduleTask.queue == queue)
+    rows, next_cursor = _paginate(query, (ScheduleTask.id,), limit)
+
+    response = jsonify(items=[schedule_to_dict(x) for x in rows],
+                       next=next_cursor)
+    response.set_etag(etag)
+    return response
+
+
+@app.route('/api/schedules/forecast')
+def forecast_schedules():
+    data = forecast(
+        days=_get_int_arg('days', 7, MAX_FORECAST_DAYS, 1),
+        window=_get_int_arg('window', 15, 24 * 60, 1),
+        top=_get_int_arg('top', 5, 100),
+        per_minute=request.args.get('per_minute') in ('1', 'true', 'yes')
+    )
+    return jsonify(data)
+
+
+@app.route('/api/stats')
+def list_stats():
+    group_by = tuple(
+        x for x in request.args.get('group_by', 'task').split(',')
+        if x in ('task', 'worker', 'minute')
+    ) or ('task',)
+    kwargs = dict(
+        task=request.args.get('task') or None,
+        worker=request.args.get('worker') or None,
+        until=_get_datetime_arg('until'),
+        group_by=group_by
+    )
+    # Rollups are kept forever, always read a bounded range of them.
+    since = _get_datetime_arg('since')
+    if since is not None:
+        data = query_stats(since=since, **kwargs)
+    else:
+        data = last_window(**kwargs)
+    for item in data:
+        if 'minute' in item:
+            item['minute'] = _isoformat(item['minute'])
+    return jsonify(items=data)
+
+
+@app.route('/api/stream')
+def stream_events():
+    # Each client holds a server thread, serve this from a threaded or
+    # async (e.g. gevent) server.
+    subscriber = event_stream.subscribe()
+    if subscriber is None:
+        abort(503, 'Too many stream clients')
+
+    response = Response(event_stream.iter_sse(subscriber),
+                        mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache',
+                                 'X-Accel-Buffering': 'no'})
+    # Also covers clients that go away before the first message.
+    response.call_on_close(lambda: event_stream.unsubscribe(subscriber))
+    return response
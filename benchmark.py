@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Scheduler and result backend benchmarks.
+
+Runs against a temporary SQLite database and the in-memory broker, so it
+needs no running services::
+
+    python benchmark.py --schedules 10000 --output bench.json
+
+Results are emitted as JSON to compare between commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+
+base_dir = os.path.abspath(os.path.dirname(__file__))
+
+CRONTAB_MINUTES = ('*', '*/5', '*/15', '0', '15,45', '30')
+CRONTAB_HOURS = ('*', '*/2', '9-17', '0', '4')
+INTERVAL_SECONDS = (10, 30, 60, 300, 900, 3600)
+TASKS = ('app.schedule.tasks.test_sleep_1', 'app.schedule.tasks.test_sleep_3')
+QUEUES = (None, 'default', 'reports', 'mail')
+WORKER = 'bench@localhost'
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'runs': len(samples),
+        'min': samples[0],
+        'median': samples[len(samples) // 2],
+        'max': samples[-1],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=base_dir,
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def generate_schedules(count, crontab_ratio, seed):
+    """Insert ``count`` synthetic schedule tasks with run metadata."""
+    from app import db
+    from app.schedule.models import CrontabSchedule
+    from app.schedule.models import IntervalSchedule
+    from app.schedule.models import ScheduleInfo
+    from app.schedule.models import ScheduleMeta
+    from app.schedule.models import ScheduleTask
+
+    rnd = random.Random(seed)
+    db.session.add(ScheduleInfo(id=1))
+
+    crontabs = [
+        CrontabSchedule(minute=m, hour=h, day_of_week='*',
+                        day_of_month='*', month_of_year='*')
+        for m in CRONTAB_MINUTES for h in CRONTAB_HOURS
+    ]
+    intervals = [IntervalSchedule(every=x, period='seconds')
+                 for x in INTERVAL_SECONDS]
+    db.session.add_all(crontabs + intervals)
+    db.session.commit()
+
+    now = datetime.now()
+    for i in range(count):
+        instance = ScheduleTask(name='bench-{0}'.format(i),
+                                task=rnd.choice(TASKS),
+                                queue=rnd.choice(QUEUES))
+        if rnd.random() < crontab_ratio:
+            instance.crontab_id = rnd.choice(crontabs).id
+        else:
+            instance.interval_id = rnd.choice(intervals).id
+        db.session.add(instance)
+        db.session.flush()
+        db.session.add(ScheduleMeta(
+            parent_id=instance.id, total_run_count=0,
+            last_run_at=now - timedelta(seconds=rnd.randint(0, 3600))
+        ))
+    db.session.commit()
+
+
+def bench_scheduler(repeat, dispatch):
+    from app import celery
+    from app.schedule.schedulers import DatabaseScheduler
+
+    scheduler = DatabaseScheduler(app=celery)
+
+    # Each reload result is dropped right away, so a run never holds two
+    # schedules and tracing overhead stays out of the timings.
+    reload_times = [timed(scheduler.all_as_schedule)[0]
+                    for _ in range(repeat)]
+
+    tracemalloc.start()
+    scheduler.all_as_schedule()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Reading the schedule consumes pending change notifications, so the
+    # timed ticks below do not reload it. Nothing is due right after every
+    # entry has run, so they measure the pure overhead of change detection
+    # and `is_due` checks.
+    entries = scheduler.schedule
+    now = scheduler.app.now()
+    for entry in entries.values():
+        entry.last_run_at = now
+    tick_times = [timed(scheduler.tick)[0] for _ in range(repeat)]
+
+    names = list(entries)[:dispatch]
+    elapsed, _ = timed(
+        lambda: [scheduler.apply_async(entries[x]) for x in names]
+    )
+
+    return {
+        'entries': len(entries),
+        'reload_seconds': summarize(reload_times),
+        'reload_peak_memory_bytes': peak,
+        'tick_seconds': summarize(tick_times),
+        'dispatch': {
+            'count': len(names),
+            'seconds': elapsed,
+            'per_second': len(names) / elapsed if elapsed else None,
+        },
+    }
+
+
+def bench_backend(count):
+    from celery import states
+
+    from app import celery_state
+    from app.schedule.backends import DatabaseBackend
+
+    task_ids = [str(uuid.uuid4()) for _ in range(count)]
+    for task_id in task_ids:
+        now = time.time()
+        celery_state.event({
+            'type': 'task-received', 'uuid': task_id, 'name': TASKS[0],
+            'hostname': WORKER, 'timestamp': now, 'local_received': now,
+            'clock': 0,
+        })
+
+    def store(status):
+        for task_id in task_ids:
+            DatabaseBackend._store_result(
+                task_id, '"ok"', status, request=SimpleNamespace(id=task_id)
+            )
+
+    inserted, _ = timed(store, states.STARTED)
+    updated, _ = timed(store, states.SUCCESS)
+    return {
+        'count': count,
+        'insert_per_second': count / inserted if inserted else None,
+        'update_per_second': count / updated if updated else None,
+    }
+
+
+def run(options):
+    from app import db
+
+    db.create_all()
+    elapsed, _ = timed(generate_schedules, options.schedules,
+                       options.crontab_ratio, options.seed)
+
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'created_at': datetime.now().isoformat(),
+        'options': vars(options),
+        'generate_seconds': elapsed,
+        'scheduler': bench_scheduler(options.repeat, options.dispatch),
+        'backend': bench_backend(options.results),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--schedules', type=int, default=1000,
+                        help='number of synthetic schedule tasks')
+    parser.add_argument('-c', '--crontab-ratio', type=float, default=0.5,
+                        help='share of crontab schedules, the rest are '
+                             'interval schedules')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='runs of each timed scheduler operation')
+    parser.add_argument('-d', '--dispatch', type=int, default=500,
+                        help='number of entries to dispatch')
+    parser.add_argument('--results', type=int, default=1000,
+                        help='number of results to store')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='write JSON to this file')
+    options = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before `app` is imported, it reads them on import.
+        os.environ['DATABASE_URL'] = 'sqlite:///{0}'.format(
+            os.path.join(tmp, 'bench.sqlite3')
+        )
+        os.environ['CELERY_BROKER_URL'] = 'memory://'
+        data = run(options)
+
+    output = json.dumps(data, indent=2)
+    if options.output:
+        with open(options.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
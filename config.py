@@ -7,8 +7,9 @@ base_dir = os.path.abspath(os.path.dirname(__file__))
 
 class Config:
     # Database
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///{0}'.format(
-        os.path.join(base_dir, 'db_dev.sqlite3')
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        'DATABASE_URL',
+        'sqlite:///{0}'.format(os.path.join(base_dir, 'db_dev.sqlite3'))
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = True
     SQLALCHEMY_COMMIT_ON_TEARDOWN = False
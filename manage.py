@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import json
+
 from flask_migrate import Migrate
 from flask_migrate import MigrateCommand
 from flask_script import Manager
+from flask_script import Server
 from flask_script import Shell
 
 from app import app
@@ -18,15 +21,47 @@ def make_shell_context():
     from app.schedule.models import ScheduleTask
     from app.schedule.models import ScheduleMeta
     from app.schedule.models import ScheduleInfo
+    from app.schedule.models import TaskResult
+    from app.schedule.models import TaskStats
 
     return dict(app=app, db=db, CrontabSchedule=CrontabSchedule,
                 IntervalSchedule=IntervalSchedule, ScheduleTask=ScheduleTask,
-                ScheduleMeta=ScheduleMeta, ScheduleInfo=ScheduleInfo)
+                ScheduleMeta=ScheduleMeta, ScheduleInfo=ScheduleInfo,
+                TaskResult=TaskResult, TaskStats=TaskStats)
 
 
 manager.add_command('shell', Shell(make_context=make_shell_context))
+# `/api/stream` holds a thread per client.
+manager.add_command('runserver', Server(threaded=True))
 manager.add_command('db', MigrateCommand)
 
 
+@manager.option('-d', '--days', dest='days', type=float, default=7,
+                help='Forecast horizon in days')
+@manager.option('-w', '--window', dest='window', type=int, default=15,
+                help='Peak window length in minutes')
+@manager.option('-t', '--top', dest='top', type=int, default=5,
+                help='Number of peak windows per queue')
+@manager.option('-m', '--per-minute', dest='per_minute', action='store_true',
+                help='Include per-minute dispatch counts')
+@manager.option('-o', '--output', dest='output', default=None,
+                help='Write the forecast to a JSON file')
+def forecast(days, window, top, per_minute, output):
+    """Forecast per-queue dispatch load of enabled schedules."""
+    from app.schedule.forecast import forecast as forecast_schedules
+
+    if days <= 0 or window < 1 or top < 0:
+        print('days and window must be positive, top must not be negative')
+        return 1
+
+    data = forecast_schedules(days=days, window=window, top=top,
+                              per_minute=per_minute)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(data, f)
+    else:
+        print(json.dumps(data, indent=2))
+
+
 if __name__ == '__main__':
     manager.run()
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+# `app` connects to the broker and database on import, keep both local.
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('CELERY_BROKER_URL', 'memory://')
+
+
+@pytest.fixture
+def database():
+    from app import db
+
+    db.create_all()
+    yield db
+    db.session.remove()
+    db.drop_all()
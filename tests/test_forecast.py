@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+from datetime import timedelta
+
+import numpy as np
+
+from app.schedule.forecast import find_peaks
+from app.schedule.forecast import interval_minutes
+from app.schedule.forecast import minute_fields
+
+
+def test_minute_fields_day_boundary():
+    # Saturday 23:58 to Sunday 00:01
+    start = datetime(2026, 10, 17, 23, 58)
+    fields = minute_fields(start, 4)
+    assert fields['minute'].tolist() == [58, 59, 0, 1]
+    assert fields['hour'].tolist() == [23, 23, 0, 0]
+    assert fields['day_of_week'].tolist() == [6, 6, 0, 0]
+    assert fields['day_of_month'].tolist() == [17, 17, 18, 18]
+
+
+def test_minute_fields_month_and_year_boundary():
+    start = datetime(2026, 12, 31, 23, 59)
+    fields = minute_fields(start, 2)
+    assert fields['day_of_month'].tolist() == [31, 1]
+    assert fields['month_of_year'].tolist() == [12, 1]
+    # 2026-12-31 is a Thursday
+    assert fields['day_of_week'].tolist() == [4, 5]
+
+
+def test_minute_fields_matches_datetime():
+    start = datetime(2028, 2, 27, 12, 0)
+    fields = minute_fields(start, 3 * 24 * 60)
+    for i in range(0, 3 * 24 * 60, 97):
+        value = start + timedelta(minutes=i)
+        assert fields['minute'][i] == value.minute
+        assert fields['hour'][i] == value.hour
+        assert fields['day_of_week'][i] == value.isoweekday() % 7
+        assert fields['day_of_month'][i] == value.day
+        assert fields['month_of_year'][i] == value.month
+
+
+def test_interval_minutes_sub_minute():
+    # Runs at 30s, 75s, 120s, 165s, ...
+    counts = interval_minutes(30, 45, 4)
+    assert counts.tolist() == [1, 1, 2, 1]
+
+
+def test_interval_minutes_multi_minute():
+    counts = interval_minutes(90, 120, 6)
+    assert counts.tolist() == [0, 1, 0, 1, 0, 1]
+
+
+def test_interval_minutes_total():
+    assert interval_minutes(0, 60, 10).tolist() == [1] * 10
+    assert interval_minutes(0, 10, 60).sum() == 360
+    assert interval_minutes(600, 3600, 5).sum() == 0
+
+
+def test_find_peaks():
+    counts = np.array([0, 1, 5, 5, 0, 0, 3, 3, 0])
+    assert find_peaks(counts, 2, 3) == [(2, 10), (6, 6), (0, 1)]
+    assert find_peaks(counts, 2, 1) == [(2, 10)]
+
+
+def test_find_peaks_empty():
+    assert find_peaks(np.zeros(0, dtype=int), 15, 5) == []
+    assert find_peaks(np.zeros(10, dtype=int), 15, 5) == []
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+from datetime import timedelta
+
+from celery import states
+from sqlalchemy import text
+
+from app.schedule import stats
+from app.schedule.models import TaskResult
+from app.schedule.models import TaskStats
+from app.schedule.stats import HISTOGRAM_BOUNDS
+from app.schedule.stats import HISTOGRAM_SIZE
+from app.schedule.stats import histogram_index
+from app.schedule.stats import histogram_percentile
+from app.schedule.stats import merge_histograms
+from app.schedule.stats import query_stats
+from app.schedule.stats import record_result
+
+
+def make_result(db, runtime, status=states.SUCCESS, task='proj.add',
+                worker='w1@host', done_at=datetime(2026, 10, 19, 10, 0, 30)):
+    instance = TaskResult(task_id='{0}-{1}'.format(task, runtime),
+                          task=task, worker=worker, status=status,
+                          received_at=done_at - timedelta(seconds=runtime),
+                          done_at=done_at)
+    db.session.add(instance)
+    return instance
+
+
+def test_histogram_index():
+    assert histogram_index(0) == 0
+    assert histogram_index(-1) == 0
+    assert histogram_index(0.001) == 0
+    assert histogram_index(0.0015) == 1
+    assert histogram_index(1.0) == 10
+    assert histogram_index(HISTOGRAM_BOUNDS[-1]) == HISTOGRAM_SIZE - 2
+    assert histogram_index(HISTOGRAM_BOUNDS[-1] * 2) == HISTOGRAM_SIZE - 1
+
+
+def test_merge_histograms():
+    a = [0] * HISTOGRAM_SIZE
+    b = [0] * HISTOGRAM_SIZE
+    a[1], b[1], b[3] = 2, 1, 4
+
+    merged = merge_histograms(a, b)
+    assert merged[1] == 3
+    assert merged[3] == 4
+    assert sum(merged) == 7
+    assert a[1] == 2
+    assert merge_histograms(None, b) == b
+    assert merge_histograms(None, None) == [0] * HISTOGRAM_SIZE
+
+
+def test_histogram_percentile():
+    histogram = [0] * HISTOGRAM_SIZE
+    assert histogram_percentile(histogram, 50) is None
+
+    histogram[0], histogram[10] = 90, 10
+    assert histogram_percentile(histogram, 90) == HISTOGRAM_BOUNDS[0]
+    assert histogram_percentile(histogram, 100) == HISTOGRAM_BOUNDS[10]
+    # Interpolated inside the bucket between its bounds.
+    assert abs(histogram_percentile(histogram, 45) -
+               HISTOGRAM_BOUNDS[0] / 2) < 1e-12
+    assert abs(histogram_percentile(histogram, 95) -
+               (HISTOGRAM_BOUNDS[9] + HISTOGRAM_BOUNDS[10]) / 2) < 1e-12
+
+
+def test_histogram_percentile_clamped_to_maximum():
+    histogram = [0] * HISTOGRAM_SIZE
+    histogram[histogram_index(1.201)] = 5
+    assert histogram_percentile(histogram, 99, 1.201) == 1.201
+    assert histogram_percentile(histogram, 10, 1.201) < 1.201
+
+
+def test_histogram_percentile_overflow():
+    histogram = [0] * HISTOGRAM_SIZE
+    histogram[-1] = 1
+    assert histogram_percentile(histogram, 99) == HISTOGRAM_BOUNDS[-1]
+    maximum = HISTOGRAM_BOUNDS[-1] * 2
+    assert HISTOGRAM_BOUNDS[-1] < histogram_percentile(
+        histogram, 50, maximum) < maximum
+
+
+def test_record_result_ignores_unready_states(database):
+    record_result(make_result(database, 1, status=states.STARTED))
+    database.session.commit()
+    assert TaskStats.query.count() == 0
+
+
+def test_record_result_counts_failures(database):
+    record_result(make_result(database, 0.5))
+    record_result(make_result(database, 1.5, status=states.FAILURE))
+    record_result(make_result(database, 2.5, task='proj.mul'))
+    database.session.commit()
+
+    instance = TaskStats.query.filter_by(task='proj.add').one()
+    assert instance.minute == datetime(2026, 10, 19, 10, 0)
+    assert instance.count == 2
+    assert instance.failures == 1
+    assert instance.runtime_total == 2.0
+    assert instance.runtime_max == 1.5
+    assert sum(instance.histogram) == 2
+    assert instance.histogram[histogram_index(1.5)] == 1
+
+
+def test_record_result_error_keeps_result(database, monkeypatch):
+    def broken_rollup(*args):
+        database.session.execute(text('UPDATE missing_table SET x = 1'))
+
+    monkeypatch.setattr(stats, '_update_rollup', broken_rollup)
+    assert record_result(make_result(database, 1)) is None
+    database.session.commit()
+
+    assert TaskResult.query.count() == 1
+    assert TaskStats.query.count() == 0
+
+
+def test_query_stats_grouping(database):
+    record_result(make_result(database, 0.5, worker='w1@host'))
+    record_result(make_result(database, 1.201, worker='w2@host'))
+    record_result(make_result(
+        database, 1.0, worker='w2@host',
+        done_at=datetime(2026, 10, 19, 10, 5)
+    ))
+    record_result(make_result(database, 3.0, task='proj.mul'))
+    database.session.commit()
+
+    data = query_stats(task='proj.add')
+    assert len(data) == 1
+    item = data[0]
+    assert item['task'] == 'proj.add'
+    assert item['count'] == 3
+    assert item['runtime_max'] == 1.201
+    assert abs(item['runtime_mean'] - 2.701 / 3) < 1e-9
+    assert item['runtime_p99'] <= item['runtime_max']
+
+    data = query_stats(task='proj.add', group_by=('worker',))
+    assert sorted((x['worker'], x['count']) for x in data) == [
+        ('w1@host', 1), ('w2@host', 2)
+    ]
+
+    data = query_stats(since=datetime(2026, 10, 19, 10, 1),
+                       group_by=('task', 'minute'))
+    assert [(x['task'], x['minute'], x['count']) for x in data] == [
+        ('proj.add', datetime(2026, 10, 19, 10, 5), 1)
+    ]
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import app as app_module
+from app import app
+from app import celery_state
+from app import on_celery_event
+from app.schedule.stream import EventStream
+from app.schedule.stream import Subscriber
+from app.schedule.stream import event_stream
+
+
+@pytest.fixture
+def state():
+    celery_state.clear()
+    yield celery_state
+    celery_state.clear()
+
+
+def worker_event(hostname, clock):
+    return {'type': 'worker-online', 'hostname': hostname, 'freq': 60,
+            'timestamp': 1000.0 + clock, 'local_received': 1000.0 + clock,
+            'clock': clock}
+
+
+def task_event(uuid, clock, hostname='w1@host'):
+    return {'type': 'task-received', 'uuid': uuid, 'name': 'proj.add',
+            'hostname': hostname, 'timestamp': 1000.0 + clock,
+            'local_received': 1000.0 + clock, 'clock': clock}
+
+
+def test_subscriber_coalesces_by_key():
+    subscriber = Subscriber(buffer_size=10)
+    subscriber.push(('task', 'a'), {'state': 'RECEIVED'})
+    subscriber.push(('task', 'b'), {'state': 'RECEIVED'})
+    subscriber.push(('task', 'a'), {'state': 'SUCCESS'})
+
+    items, dropped = subscriber.drain()
+    assert items == [(('task', 'b'), {'state': 'RECEIVED'}),
+                     (('task', 'a'), {'state': 'SUCCESS'})]
+    assert dropped == 0
+    assert subscriber.drain() == ([], 0)
+
+
+def test_subscriber_overflow_drops_oldest():
+    subscriber = Subscriber(buffer_size=2)
+    for key in 'abc':
+        subscriber.push(('task', key), {})
+    assert subscriber.wait(0)
+
+    items, dropped = subscriber.drain()
+    assert [k for k, _ in items] == [('task', 'b'), ('task', 'c')]
+    assert dropped == 1
+    assert subscriber.drain() == ([], 0)
+    assert not subscriber.wait(0)
+
+
+def test_subscribe_snapshot_keeps_workers(state):
+    clock = 0
+    for hostname in ('w1@host', 'w2@host'):
+        clock += 1
+        state.event(worker_event(hostname, clock))
+    for i in range(10):
+        clock += 1
+        state.event(task_event('task-{0}'.format(i), clock))
+
+    stream = EventStream(buffer_size=5)
+    subscriber = stream.subscribe()
+    assert subscriber.dropped == 0
+
+    # Live overflow evicts the oldest snapshot task, never the workers.
+    subscriber.push(('task', 'live'), {})
+    items, dropped = subscriber.drain()
+    keys = [k for k, _ in items]
+    assert keys == [('task', 'task-8'), ('task', 'task-9'),
+                    ('worker', 'w1@host'), ('worker', 'w2@host'),
+                    ('task', 'live')]
+    assert dropped == 1
+
+
+def test_publish_sends_deltas(state):
+    stream = EventStream()
+    subscriber = stream.subscribe()
+    event = task_event('task-1', 1)
+    state.event(event)
+    stream.publish(event)
+
+    items, _ = subscriber.drain()
+    key, data = items[-1]
+    assert key == ('task', 'task-1')
+    assert data['name'] == 'proj.add'
+    assert data['worker'] == 'w1@host'
+
+    stream.unsubscribe(subscriber)
+    stream.publish(event)
+    assert subscriber.drain() == ([], 0)
+
+
+def test_subscriber_cap(state):
+    stream = EventStream(max_subscribers=1)
+    subscriber = stream.subscribe()
+    assert subscriber is not None
+    assert stream.subscribe() is None
+
+    stream.unsubscribe(subscriber)
+    assert stream.subscribe() is not None
+
+
+def test_stream_endpoint_full(state, monkeypatch):
+    monkeypatch.setattr(event_stream, 'max_subscribers', 0)
+    response = app.test_client().get('/api/stream')
+    assert response.status_code == 503
+
+
+def test_failing_handler_keeps_monitor(state, monkeypatch):
+    seen = []
+
+    def broken(event):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(app_module, 'celery_event_handlers',
+                        [broken, seen.append])
+    on_celery_event(worker_event('w1@host', 1))
+
+    assert len(seen) == 1
+    assert 'w1@host' in state.workers
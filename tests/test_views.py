@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+from datetime import timedelta
+import json
+
+import pytest
+
+from app import app
+from app.schedule import views
+from app.schedule.models import ScheduleInfo
+from app.schedule.models import ScheduleTask
+from app.schedule.models import TaskResult
+
+T0 = datetime(2026, 10, 19, 10, 0)
+
+
+@pytest.fixture
+def client(database):
+    return app.test_client()
+
+
+def add_results(db, done_at):
+    for i, value in enumerate(done_at):
+        db.session.add(TaskResult(
+            task_id='task-{0}'.format(i), task='proj.add', status='SUCCESS',
+            worker='w1@host', received_at=value, done_at=value
+        ))
+    db.session.commit()
+
+
+def get_json(client, url, status=200):
+    response = client.get(url)
+    assert response.status_code == status
+    return json.loads(response.get_data(as_text=True))
+
+
+def collect_pages(client, url):
+    ids = []
+    cursor = None
+    while True:
+        page_url = url if cursor is None else '{0}&after={1}'.format(url,
+                                                                     cursor)
+        data = get_json(client, page_url)
+        ids.extend(x['id'] for x in data['items'])
+        cursor = data['next']
+        if cursor is None:
+            return ids
+
+
+def test_results_keyset_pagination(client, database):
+    add_results(database, [T0] * 5)
+
+    data = get_json(client, '/api/results?limit=2')
+    assert [x['id'] for x in data['items']] == [5, 4]
+    assert data['next'] == '4'
+    assert collect_pages(client, '/api/results?limit=2') == [5, 4, 3, 2, 1]
+
+
+def test_results_time_range_pagination(client, database):
+    t1 = T0 + timedelta(minutes=1)
+    t2 = T0 + timedelta(minutes=2)
+    add_results(database, [t2, t1, t1, t1, T0])
+
+    url = '/api/results?limit=2&since=2026-10-19T10:00'
+    data = get_json(client, url)
+    assert [x['id'] for x in data['items']] == [1, 4]
+    assert data['next'] == '{0},4'.format(t1.isoformat())
+    assert collect_pages(client, url) == [1, 4, 3, 2, 5]
+
+    url = '/api/results?limit=2&since=2026-10-19T10:01&until=2026-10-19T10:02'
+    assert collect_pages(client, url) == [4, 3, 2]
+
+
+@pytest.mark.parametrize('query', [
+    'limit=0',
+    'limit=-1',
+    'limit=x',
+    'since=yesterday',
+    'after=x',
+    'since=2026-10-19&after=5',
+])
+def test_results_bad_arguments(client, query):
+    assert client.get('/api/results?' + query).status_code == 400
+
+
+def test_export_results(client, database, monkeypatch):
+    monkeypatch.setattr(views, 'EXPORT_CHUNK_SIZE', 2)
+    add_results(database, [T0 + timedelta(minutes=x) for x in range(5)])
+
+    data = get_json(client, '/api/results/export')
+    assert [x['id'] for x in data] == [5, 4, 3, 2, 1]
+
+    data = get_json(client, '/api/results/export?since=2026-10-19T10:01'
+                            '&until=2026-10-19T10:04')
+    assert [x['id'] for x in data] == [4, 3, 2]
+
+    assert get_json(client, '/api/results/export?task=missing') == []
+
+
+def test_schedules_etag(client, database):
+    ScheduleInfo.get_last_change_at()
+    for name in ('a', 'b'):
+        database.session.add(ScheduleTask(name=name, task='proj.add'))
+    database.session.commit()
+
+    response = client.get('/api/schedules')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    data = json.loads(response.get_data(as_text=True))
+    assert [x['name'] for x in data['items']] == ['b', 'a']
+
+    response = client.get('/api/schedules', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    database.session.delete(ScheduleTask.query.filter_by(name='b').one())
+    database.session.commit()
+
+    response = client.get('/api/schedules', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    data = json.loads(response.get_data(as_text=True))
+    assert [x['name'] for x in data['items']] == ['a']
+
+
+def test_schedules_pagination(client, database):
+    for i in range(3):
+        database.session.add(ScheduleTask(name=str(i), task='proj.add'))
+    database.session.commit()
+
+    assert collect_pages(client, '/api/schedules?limit=1') == [3, 2, 1]
+    assert client.get('/api/schedules?limit=0').status_code == 400